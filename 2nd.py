@@ -2,7 +2,6 @@
 #1. Detailed PDF reports of project materials and costs
 #2. Support for different woods
 #4. Multiple projects
-#5. Conversion between metric and standard
 #6. Customizable default sheet sizes
 #7. Include Tax
 #8. GUI
@@ -10,37 +9,257 @@
 import math
 import csv
 import os
+import re
+import json
+import time
+import bisect
+import hashlib
+import sqlite3
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from functools import lru_cache
+from itertools import groupby
+from multiprocessing import shared_memory
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.units import inch
 
+try:
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet/Arrow import and export are optional
+    pa = None
+
+DEFAULT_MATERIAL = "Plywood"
+
+# Dimensions are stored as integer ticks so fit tests and area sums are exact.
+# 1/8128" is the largest tick that divides both 1/64" and 0.1 mm evenly.
+TICKS_PER_INCH = 8128
+UNIT_TICKS = {
+    "in": TICKS_PER_INCH,
+    "ft": TICKS_PER_INCH * 12,
+    "mm": 320,
+    "cm": 3200,
+}
+UNIT_ALIASES = {
+    '"': "in",
+    "inch": "in",
+    "inches": "in",
+    "'": "ft",
+    "foot": "ft",
+    "feet": "ft",
+    "millimeter": "mm",
+    "millimeters": "mm",
+    "centimeter": "cm",
+    "centimeters": "cm",
+}
+
+
+def to_ticks(value, unit="in"):
+    """
+    Convert a dimension to integer ticks.
+
+    Accepts numbers or strings such as '23 7/8', '23-7/8', '3/4"', '600mm' or
+    '60.5 cm'. A unit written after the number overrides the default unit.
+    Zero and negative dimensions and malformed values such as '1/0' raise
+    ValueError.
+    """
+    if isinstance(value, str):
+        number, suffix = re.fullmatch(r"(.*?)\s*([a-z\"']*)", value.strip().lower()).groups()
+        if suffix:
+            unit = UNIT_ALIASES.get(suffix, suffix)
+        # A hyphen only separates a whole number from its fraction, as in 23-7/8
+        parts = re.sub(r"(?<=\d)-(?=\d+/\d+$)", " ", number).split()
+        if not 1 <= len(parts) <= 2 or (len(parts) == 2 and not re.fullmatch(r"\d+ \d+/\d+", " ".join(parts))):
+            raise ValueError(f"Invalid dimension: {value!r}")
+        try:
+            amount = sum(Fraction(part) for part in parts)
+        except ZeroDivisionError:
+            raise ValueError(f"Invalid dimension: {value!r}") from None
+    else:
+        amount = Fraction(str(value))
+    if unit not in UNIT_TICKS:
+        raise ValueError(f"Unknown unit: {unit}")
+    ticks = round(amount * UNIT_TICKS[unit])
+    if ticks <= 0:
+        raise ValueError(f"Dimension must be greater than zero: {value!r}")
+    return ticks
+
+
+def from_ticks(ticks, unit="in"):
+    """Convert integer ticks back to a float in the given unit."""
+    return ticks / UNIT_TICKS[unit]
+
+
+def area_from_ticks(area, unit="in"):
+    """Convert an area in square ticks to square units."""
+    return area / UNIT_TICKS[unit] ** 2
+
+
+def format_dimension(ticks, unit="in"):
+    """Format ticks for display, e.g. 23.875" or 606.4 mm."""
+    suffix = '"' if unit == "in" else f" {unit}"
+    return f"{from_ticks(ticks, unit):g}{suffix}"
+
+
+# Offcuts narrower than this are scrap; area buckets for the offcut histogram
+USABLE_OFFCUT_WIDTH = to_ticks(6)
+OFFCUT_BUCKETS = [to_ticks(1) ** 2 * area for area in (36, 72, 144, 288, 576, 1152, 2304)]
+
+
+@lru_cache(maxsize=None)
+def pieces_per_sheet(sheet_length, sheet_width, piece_length, piece_width):
+    """How many pieces fit on one sheet in a simple grid (all values in ticks)."""
+    return (sheet_length // piece_length) * (sheet_width // piece_width)
+
+
+@lru_cache(maxsize=4096)
+def nest_piece(sheet_length, sheet_width, length, width, quantity):
+    """
+    Lay out quantity pieces of one size on as many sheets as needed. Returns a
+    (pieces on sheet, waste area) tuple per sheet, all in ticks.
+    """
+    sheet_total_area = sheet_length * sheet_width
+    per_sheet = pieces_per_sheet(sheet_length, sheet_width, length, width)
+    if per_sheet == 0:
+        # If piece is too large, count each one as a full sheet of waste
+        return ((0, sheet_total_area),) * quantity
+    full_sheets, remainder = divmod(quantity, per_sheet)
+    sheets = [(per_sheet, sheet_total_area - per_sheet * length * width)] * full_sheets
+    if remainder:
+        sheets.append((remainder, sheet_total_area - remainder * length * width))
+    return tuple(sheets)
+
+
+def parse_grain(value):
+    return str(value).strip().lower() in ("y", "yes", "true", "1")
+
+
 class WoodProject:
-    def __init__(self, project_name):
+    def __init__(self, project_name, units="in"):
         self.project_name = project_name
+        self.units = units
+        self.sheet_length = to_ticks(96)
+        self.sheet_width = to_ticks(48)
         self.plywood_pieces = []
+        self.piece_index = {}  # (length, width, material, grain) -> entry in plywood_pieces
         self.waste_tracking = []  # New attribute to track waste
+        self.sheet_layouts = []  # One entry per sheet from the last sheet calculation
+        self.waste_stats = WasteStats()
         self.additional_materials = []
+        self.assemblies = {}  # name -> {"pieces", "materials", "parts"} template
+        self.assembly_instances = {}  # name -> quantity used directly in this project
+        self.assembly_cache = {}  # name -> memoized expansion of one assembly
+        self.cached_cut_list = None
+        self.store = None  # ProjectStore the project was saved to or loaded from
 
-    def add_plywood_piece(self, length, width, quantity):
-        piece = {
-            "length": length,
-            "width": width,
-            "quantity": quantity
-        }
-        self.plywood_pieces.append(piece)
-        print(f"Added {quantity} pieces: {length}\" x {width}\"")
+    def add_plywood_piece(self, length, width, quantity, unit=None, material=DEFAULT_MATERIAL, grain=False, label=None):
+        """
+        Add pieces to the cut list. Length and width are numbers in the
+        project units or strings like '23 7/8' and '600mm'. Pieces matching an
+        existing size, material and grain are merged into that entry.
+        """
+        unit = unit or self.units
+        piece = self.merge_piece(to_ticks(length, unit), to_ticks(width, unit), quantity, material, grain, label)
+        print(f"Added {quantity} pieces: {self.format_size(piece)} {piece['material']}")
+
+    def merge_piece(self, length, width, quantity, material=DEFAULT_MATERIAL, grain=False, label=None):
+        """Add quantity to the entry for this piece in O(1), creating it if needed."""
+        key = (length, width, material, grain)
+        piece = self.piece_index.get(key)
+        if piece is None:
+            piece = {
+                "length": length,
+                "width": width,
+                "quantity": 0,
+                "material": material,
+                "grain": grain,
+                "labels": {}
+            }
+            self.piece_index[key] = piece
+            self.plywood_pieces.append(piece)
+        piece["quantity"] += quantity
+        if label:
+            count = piece["labels"].get(label, 0) + quantity
+            if count > 0:
+                piece["labels"][label] = count
+            else:
+                piece["labels"].pop(label, None)
+        if piece["quantity"] <= 0:
+            # Negative quantities come from rows removed from a watched file
+            del self.piece_index[key]
+            self.plywood_pieces.remove(piece)
+        self.cached_cut_list = None
+        return piece
+
+    def clear_pieces(self):
+        self.plywood_pieces = []
+        self.piece_index = {}
+        self.cached_cut_list = None
+
+    def cut_list(self):
+        """
+        Every piece to cut: the loose pieces plus all assembly instances
+        expanded, merged by piece key. Cached until pieces or assemblies change.
+        """
+        if self.cached_cut_list is not None:
+            return self.cached_cut_list
+        pieces = {}
+
+        def merge(length, width, quantity, material, grain, labels):
+            piece = pieces.get((length, width, material, grain))
+            if piece is None:
+                piece = pieces[(length, width, material, grain)] = {
+                    "length": length,
+                    "width": width,
+                    "quantity": 0,
+                    "material": material,
+                    "grain": grain,
+                    "labels": {}
+                }
+            piece["quantity"] += quantity
+            for label, count in labels.items():
+                piece["labels"][label] = piece["labels"].get(label, 0) + count
+
+        for piece in self.plywood_pieces:
+            merge(piece["length"], piece["width"], piece["quantity"], piece["material"], piece["grain"], piece["labels"])
+        for name, instances in self.assembly_instances.items():
+            expanded_pieces, _ = self.expand_assembly(name)
+            for (length, width, material, grain, label), quantity in expanded_pieces.items():
+                merge(length, width, quantity * instances, material, grain, {label: quantity * instances})
+        self.cached_cut_list = list(pieces.values())
+        return self.cached_cut_list
+
+    def format_size(self, piece):
+        return f"{format_dimension(piece['length'], self.units)} x {format_dimension(piece['width'], self.units)}"
+
+    def set_units(self):
+        units = input(f"Enter display units ({'/'.join(UNIT_TICKS)}): ").strip().lower()
+        units = UNIT_ALIASES.get(units, units)
+        if units not in UNIT_TICKS:
+            print("Invalid units. Keeping", self.units)
+            return
+        self.units = units
+        print(f"Units set to {units}.")
     
     def new_plywood_piece(self):
         while True:
             try:
-                length = float(input("Enter piece length (inches): "))
-                width = float(input("Enter piece width (inches): "))
+                length = input(f"Enter piece length ({self.units}): ")
+                width = input(f"Enter piece width ({self.units}): ")
                 quantity = int(input("Enter quantity needed: "))
-                self.add_plywood_piece(length, width, quantity)
+                material = input(f"Enter material (blank for {DEFAULT_MATERIAL}): ").strip() or DEFAULT_MATERIAL
+                grain = parse_grain(input("Does the grain have to run along the length? (y/n): "))
+                label = input("Enter a part label (optional): ").strip() or None
+                self.add_plywood_piece(length, width, quantity, material=material, grain=grain, label=label)
             except ValueError:
-                print("Invalid input. Please enter numeric values for length, width, and quantity.")
+                print("Invalid input. Enter dimensions like 23 7/8 or 600mm and a whole number quantity.")
                 continue
 
             decision = input("Do you want to add another piece? (y/n): ").lower()
@@ -58,10 +277,22 @@ class WoodProject:
         with open(file_name, mode="w", newline="") as file:
             writer = csv.writer(file)
             # Write header
-            writer.writerow(["Length (in)", "Width (in)", "Quantity"])
-            # Write each piece
+            writer.writerow([f"Length ({self.units})", f"Width ({self.units})", "Quantity", "Material", "Grain", "Label"])
+            # Write each piece, one row per label so labels survive a reload
             for piece in self.plywood_pieces:
-                writer.writerow([piece["length"], piece["width"], piece["quantity"]])
+                rows = list(piece["labels"].items())
+                unlabeled = piece["quantity"] - sum(piece["labels"].values())
+                if unlabeled > 0:
+                    rows.append(("", unlabeled))
+                for label, quantity in rows:
+                    writer.writerow([
+                        from_ticks(piece["length"], self.units),
+                        from_ticks(piece["width"], self.units),
+                        quantity,
+                        piece["material"],
+                        "y" if piece["grain"] else "n",
+                        label
+                    ])
         print(f"Project saved to {file_name}.")
 
     def read_from_csv(self):
@@ -70,24 +301,250 @@ class WoodProject:
         try:
             with open(file_name, mode="r") as file:
                 reader = csv.DictReader(file)
-                self.plywood_pieces = []
+                length_column, width_column, unit = dimension_columns(reader.fieldnames)
+                self.clear_pieces()
                 for row in reader:
-                    piece = {
-                        "length": float(row["Length (in)"]),
-                        "width": float(row["Width (in)"]),
-                        "quantity": int(row["Quantity"])
-                    }
-                    self.plywood_pieces.append(piece)
+                    self.merge_piece(
+                        to_ticks(row[length_column], unit),
+                        to_ticks(row[width_column], unit),
+                        int(row["Quantity"]),
+                        row.get("Material") or DEFAULT_MATERIAL,
+                        parse_grain(row.get("Grain", "")),
+                        row.get("Label") or None
+                    )
+            print(f"Project loaded from {file_name}.")
+        except FileNotFoundError:
+            print(f"Error: {file_name} not found.")
+        except Exception as e:
+            print(f"An error occurred: {e}")
+
+    def read_from_columnar(self, file_name=None):
+        """
+        Load a cut list from a Parquet (.parquet) or Arrow IPC (.arrow/.feather)
+        file with the same columns as the CSV. Unit conversion and merging of
+        duplicate rows happen inside Arrow, so only one Python object is made
+        per distinct piece.
+        """
+        if pa is None:
+            print("Parquet/Arrow support needs pyarrow and numpy installed.")
+            return
+        if file_name is None:
+            file_name = input("Enter the Parquet or Arrow file to load: ")
+        try:
+            grouped = group_cut_list(read_arrow_table(file_name))
+            self.clear_pieces()
+            for row in grouped.to_pylist():
+                self.merge_piece(row["length"], row["width"], row["quantity"], row["material"], row["grain"], row["label"] or None)
             print(f"Project loaded from {file_name}.")
         except FileNotFoundError:
             print(f"Error: {file_name} not found.")
         except Exception as e:
             print(f"An error occurred: {e}")
 
+    def layout_tables(self):
+        """
+        Build Arrow tables of the last sheet calculation: one row per placed
+        piece and one row per sheet. Placements are generated with vectorized
+        numpy arithmetic from the per-sheet grid, not per-piece Python objects.
+        """
+        layouts = self.sheet_layouts
+        units = self.units
+        scale = UNIT_TICKS[units]
+        sheet_numbers = np.array([layout["sheet_number"] for layout in layouts], dtype=np.int64)
+        counts = np.array([layout["count"] for layout in layouts], dtype=np.int64)
+        rows = np.array([layout["rows"] for layout in layouts], dtype=np.int64)
+        lengths = np.array([layout["length"] for layout in layouts], dtype=np.int64)
+        widths = np.array([layout["width"] for layout in layouts], dtype=np.int64)
+        materials = pa.array([layout["material"] for layout in layouts], pa.string())
+        sheet_area = np.array([layout["sheet_length"] * layout["sheet_width"] for layout in layouts], dtype=np.int64)
+        waste_area = np.array([layout["waste_area"] for layout in layouts], dtype=np.int64)
+
+        # Index of every piece within its sheet, then its grid column and row
+        owner = np.repeat(np.arange(len(layouts)), counts)
+        starts = np.cumsum(counts) - counts
+        position = np.arange(counts.sum()) - starts[owner]
+        x = (position // rows[owner]) * lengths[owner]
+        y = (position % rows[owner]) * widths[owner]
+
+        placements = pa.table({
+            "Sheet": sheet_numbers[owner],
+            "Material": materials.take(pa.array(owner)),
+            f"X ({units})": x / scale,
+            f"Y ({units})": y / scale,
+            f"Length ({units})": lengths[owner] / scale,
+            f"Width ({units})": widths[owner] / scale,
+        })
+        sheets = pa.table({
+            "Sheet": sheet_numbers,
+            "Material": materials,
+            f"Piece Length ({units})": lengths / scale,
+            f"Piece Width ({units})": widths / scale,
+            "Pieces": counts,
+            f"Used Area (sq {units})": (sheet_area - waste_area) / scale ** 2,
+            f"Waste Area (sq {units})": waste_area / scale ** 2,
+            "Waste Percentage": waste_area / sheet_area * 100,
+        })
+        return placements, sheets
+
+    def export_results(self, file_name=None):
+        """
+        Write the nesting placements and per-sheet waste to
+        <name>_placements.parquet and <name>_sheets.parquet.
+        """
+        if pa is None:
+            print("Parquet/Arrow support needs pyarrow and numpy installed.")
+            return
+        if file_name is None:
+            file_name = input("Enter file name to export results to: ")
+        if not self.layouts_match_cut_list():
+            self.calculate_plywood_sheets()
+        placements, sheets = self.layout_tables()
+        pq.write_table(placements, f"{file_name}_placements.parquet")
+        pq.write_table(sheets, f"{file_name}_sheets.parquet")
+        print(f"Results exported to {file_name}_placements.parquet and {file_name}_sheets.parquet.")
+
+    def cut_sequence(self):
+        """
+        Order the sheets of the last sheet calculation so saw setups change as
+        rarely as possible. Sheets sharing a rip width and crosscut length are
+        one setup, so the tour is solved over distinct setups, not sheets.
+        """
+        if not self.layouts_match_cut_list():
+            self.calculate_plywood_sheets()
+        setups = {}
+        for layout in self.sheet_layouts:
+            setups.setdefault((layout["width"], layout["length"]), []).append(layout)
+        keys = list(setups)
+        order = tour_order(keys, setup_changes)
+        return [layout for index in order for layout in setups[keys[index]]]
+
+    def export_cut_plan(self, file_name=None, machine=None):
+        """
+        Write an ordered cut plan: a plain-text rip/crosscut list for a panel
+        saw or simple G-code contour paths for a CNC router.
+        """
+        if file_name is None:
+            file_name = input("Enter file name to save the cut plan to: ")
+        if machine is None:
+            machine = input("Cut plan for (s)aw or (c)nc? ").strip().lower()[:1]
+        sheets = self.cut_sequence()
+        if machine == "c":
+            file_name = f"{file_name}.nc"
+            lines = self.gcode_lines(sheets)
+        else:
+            file_name = f"{file_name}_cuts.txt"
+            lines = self.saw_cut_lines(sheets)
+        with open(file_name, mode="w") as file:
+            file.write("\n".join(lines) + "\n")
+        print(f"Cut plan for {len(sheets)} sheets saved to {file_name}.")
+
+    def saw_cut_lines(self, sheets):
+        units = self.units
+        lines = [f"Cut plan for {self.project_name}"]
+        changes = 0
+        previous = None
+        for order, layout in enumerate(sheets, start=1):
+            setup = (layout["width"], layout["length"])
+            if previous is not None:
+                changes += setup_changes(previous, setup)
+            previous = setup
+            lines.append("")
+            lines.append(f"Sheet {order} (layout {layout['sheet_number']}): {self.format_size(layout)} {layout['material']}, {layout['count']} pieces")
+            lines.append(f"  Rip fence {format_dimension(layout['width'], units)}, crosscut stop {format_dimension(layout['length'], units)}")
+            step = 1
+            for cut, strip, position in guillotine_cuts(layout["sheet_length"], layout["sheet_width"], layout["length"], layout["width"], layout["count"], layout["rows"]):
+                if cut == "rip":
+                    lines.append(f"  {step}. Rip strip {strip} at {format_dimension(position, units)}")
+                else:
+                    lines.append(f"  {step}. Crosscut strip {strip} at {format_dimension(position, units)}")
+                step += 1
+        lines.append("")
+        lines.append(f"Total fence/stop changes: {changes}")
+        return lines
+
+    def gcode_lines(self, sheets, cut_depth=0.75, safe_height=0.25, feed_rate=100, spindle_speed=18000):
+        """
+        Simple G-code: each piece is one rectangular contour at full depth,
+        visited in toolpath order. Depths are inches and feed_rate is inches
+        per minute; metric projects are written in millimetres. The spindle
+        starts at spindle_speed rpm once each sheet is loaded and stops after
+        its final retract.
+
+        The contours follow the piece edges with no tool radius offset, so
+        pieces come out undersized by the bit radius. The layouts leave no
+        kerf between pieces, so there is no room to offset the path outward.
+        """
+        metric = self.units in ("mm", "cm")
+        unit = "mm" if metric else "in"
+        depth = to_ticks(cut_depth)
+        safe = to_ticks(safe_height)
+        feed = to_ticks(feed_rate)
+
+        def value(ticks):
+            return f"{from_ticks(ticks, unit):.4f}"
+
+        lines = [
+            f"({self.project_name} cut plan)",
+            "(Contours run on the piece edges: no tool radius compensation)",
+            "G21" if metric else "G20",
+            "G90",
+        ]
+        for order, layout in enumerate(sheets, start=1):
+            lines.append(f"(Sheet {order}: {self.format_size(layout)} {layout['material']})")
+            lines.append("M0 (Load sheet)")
+            lines.append(f"M3 S{spindle_speed}")
+            for x, y in toolpath(layout["length"], layout["width"], layout["count"], layout["rows"]):
+                corners = [(x, y), (x + layout["length"], y), (x + layout["length"], y + layout["width"]), (x, y + layout["width"]), (x, y)]
+                lines.append(f"G0 Z{value(safe)}")
+                lines.append(f"G0 X{value(x)} Y{value(y)}")
+                lines.append(f"G1 Z{value(-depth)} F{value(feed)}")
+                for corner_x, corner_y in corners[1:]:
+                    lines.append(f"G1 X{value(corner_x)} Y{value(corner_y)}")
+            lines.append(f"G0 Z{value(safe)}")
+            lines.append("M5")
+        lines.append("M30")
+        return lines
+
+    def watch_csv(self, file_name=None, sheet_price=0, interval=0.2):
+        """
+        Re-estimate every time a cut-list CSV is saved. Only rows that changed
+        since the last read are parsed, and nesting is cached per piece, so a
+        refresh only redoes the work for what actually changed. Stop with Ctrl+C.
+        """
+        if file_name is None:
+            file_name = f"{input('What is the name of the file to watch: ')}.csv"
+            try:
+                sheet_price = float(input("Enter the price per sheet of plywood (blank to skip): $") or 0)
+            except ValueError:
+                sheet_price = 0
+        watcher = CutListWatcher(self, file_name)
+        print(f"Watching {file_name}. Press Ctrl+C to stop.")
+        try:
+            while True:
+                started = time.perf_counter()
+                change = watcher.poll()
+                if change is not None:
+                    self.print_estimate(sheet_price, change, time.perf_counter() - started)
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
+
+    def print_estimate(self, sheet_price, change, parse_seconds):
+        started = time.perf_counter()
+        total_sheets = self.calculate_plywood_sheets(verbose=False)
+        waste = self.waste_stats.waste_percentage()
+        added, removed = change
+        line = f"[{time.strftime('%H:%M:%S')}] +{added}/-{removed} rows: {total_sheets} sheets, {waste:.1f}% waste"
+        if sheet_price > 0:
+            cost = total_sheets * sheet_price + sum(material['price'] for material in self.all_materials())
+            line += f", ${cost:.2f} before tax"
+        elapsed = parse_seconds + time.perf_counter() - started
+        print(f"{line} ({elapsed * 1000:.0f} ms)")
+
     def calculate_board_feet(self):
         total_board_feet = 0
-        for piece in self.plywood_pieces:
-            piece_area = (piece["length"] * piece["width"]) / 144  
+        for piece in self.cut_list():
+            piece_area = area_from_ticks(piece["length"] * piece["width"]) / 144
             total_board_feet += piece_area * piece["quantity"]
         print(f"\nTotal board feet required: {total_board_feet:.2f}")
 
@@ -118,6 +575,130 @@ class WoodProject:
                 print("Invalid input.")
                 break
 
+    def define_assembly(self, name, pieces=(), materials=(), parts=(), unit=None):
+        """
+        Create or replace a reusable assembly such as a base cabinet.
+
+        pieces are (length, width, quantity[, material, grain, label]) tuples in
+        project units, materials are (name, price, quantity) tuples and parts are
+        (assembly name, quantity) pairs for sub-assemblies. Replacing a template
+        only invalidates the cached expansions that depend on it.
+        """
+        unit = unit or self.units
+        definition = {"pieces": {}, "materials": {}, "parts": {}}
+        defaults = [DEFAULT_MATERIAL, False, None]
+        for length, width, quantity, *rest in pieces:
+            material, grain, label = list(rest) + defaults[len(rest):]
+            key = (to_ticks(length, unit), to_ticks(width, unit), material, grain, f"{name}/{label}" if label else name)
+            definition["pieces"][key] = definition["pieces"].get(key, 0) + quantity
+        for material_name, price, quantity in materials:
+            key = (material_name, price)
+            definition["materials"][key] = definition["materials"].get(key, 0) + quantity
+        for part, quantity in parts:
+            if part not in self.assemblies:
+                raise ValueError(f"Unknown assembly: {part}")
+            definition["parts"][part] = definition["parts"].get(part, 0) + quantity
+        previous = self.assemblies.get(name)
+        self.assemblies[name] = definition
+        self.invalidate_assembly(name)
+        try:
+            self.expand_assembly(name)
+        except ValueError:
+            if previous is None:
+                del self.assemblies[name]
+            else:
+                self.assemblies[name] = previous
+            self.invalidate_assembly(name)
+            raise
+
+    def invalidate_assembly(self, name):
+        """Drop the cached expansion of an assembly and of every assembly using it."""
+        stale = {name}
+        changed = True
+        while changed:
+            changed = False
+            for other, definition in self.assemblies.items():
+                if other not in stale and stale.intersection(definition["parts"]):
+                    stale.add(other)
+                    changed = True
+        for other in stale:
+            self.assembly_cache.pop(other, None)
+        self.cached_cut_list = None
+
+    def expand_assembly(self, name, expanding=()):
+        """
+        Pieces and materials for one instance of an assembly, with quantities
+        multiplied through sub-assemblies. Returns ({piece key + label: qty},
+        {(material, price): qty}) and memoizes it per assembly.
+        """
+        cached = self.assembly_cache.get(name)
+        if cached is not None:
+            return cached
+        if name in expanding:
+            raise ValueError(f"Assembly {name} contains itself")
+        definition = self.assemblies[name]
+        pieces = dict(definition["pieces"])
+        materials = dict(definition["materials"])
+        for part, quantity in definition["parts"].items():
+            part_pieces, part_materials = self.expand_assembly(part, expanding + (name,))
+            for (length, width, material, grain, label), count in part_pieces.items():
+                key = (length, width, material, grain, f"{name}/{label}")
+                pieces[key] = pieces.get(key, 0) + count * quantity
+            for key, count in part_materials.items():
+                materials[key] = materials.get(key, 0) + count * quantity
+        self.assembly_cache[name] = (pieces, materials)
+        return pieces, materials
+
+    def add_assembly(self, name, quantity):
+        if name not in self.assemblies:
+            raise ValueError(f"Unknown assembly: {name}")
+        self.assembly_instances[name] = self.assembly_instances.get(name, 0) + quantity
+        self.cached_cut_list = None
+        print(f"Added {quantity} x {name}")
+
+    def new_assembly(self):
+        name = input("Enter assembly name: ").strip()
+        pieces = []
+        materials = []
+        parts = []
+        try:
+            while input("Add a piece to the assembly? (y/n): ").lower() == "y":
+                length = input(f"Enter piece length ({self.units}): ")
+                width = input(f"Enter piece width ({self.units}): ")
+                quantity = int(input("Enter quantity per assembly: "))
+                material = input(f"Enter material (blank for {DEFAULT_MATERIAL}): ").strip() or DEFAULT_MATERIAL
+                grain = parse_grain(input("Does the grain have to run along the length? (y/n): "))
+                label = input("Enter a part label (optional): ").strip() or None
+                pieces.append((length, width, quantity, material, grain, label))
+            while input("Add a material to the assembly? (y/n): ").lower() == "y":
+                material_name = input("Enter the name of the material: ")
+                material_price = float(input("Enter the price of the material: $"))
+                quantity = int(input("Enter quantity per assembly: "))
+                materials.append((material_name, material_price, quantity))
+            while input("Add a sub-assembly? (y/n): ").lower() == "y":
+                part = input(f"Enter sub-assembly name ({', '.join(self.assemblies)}): ").strip()
+                quantity = int(input("Enter quantity per assembly: "))
+                parts.append((part, quantity))
+            self.define_assembly(name, pieces, materials, parts)
+            print(f"Assembly {name} saved.")
+            quantity = int(input(f"How many {name} does this project need? (0 for none): ") or 0)
+            if quantity > 0:
+                self.add_assembly(name, quantity)
+        except ValueError as e:
+            print(f"Invalid input: {e}")
+
+    def all_materials(self):
+        """Additional materials plus those of every assembly instance, as name/price/quantity."""
+        materials = [{"name": m["name"], "price": m["price"], "quantity": 1} for m in self.additional_materials]
+        totals = {}
+        for name, instances in self.assembly_instances.items():
+            _, expanded_materials = self.expand_assembly(name)
+            for key, quantity in expanded_materials.items():
+                totals[key] = totals.get(key, 0) + quantity * instances
+        for (name, price), quantity in totals.items():
+            materials.append({"name": name, "price": price * quantity, "quantity": quantity})
+        return materials
+
     def price_calculator(self, sheet_price=0):
         """
         Calculate the total cost of plywood sheets and additional materials.
@@ -130,7 +711,7 @@ class WoodProject:
         plywood_cost = total_sheets * sheet_price
         
         # Calculate total cost of additional materials
-        additional_materials_cost = sum(material['price'] for material in self.additional_materials)
+        additional_materials_cost = sum(material['price'] for material in self.all_materials())
         
         # Calculate overall cost
         total_cost = plywood_cost + additional_materials_cost
@@ -145,74 +726,175 @@ class WoodProject:
         print(f"Total tax: ${total_tax:.2f}")
         print(f"Total Estimated Cost: ${total_cost_after_tax:.2f}")
 
-    def calculate_plywood_sheets(self, sheet_length=96, sheet_width=48):
+    def calculate_plywood_sheets(self, sheet_length=None, sheet_width=None, verbose=True, workers=1):
+        """
+        Count the sheets needed for every piece. Sheet sizes default to the
+        project sheet and are given in project units when passed in. workers
+        sets how many processes nest the materials (None uses every core);
+        the default is serial, which is faster for the grid engine so far.
+        """
+        sheet_length = self.sheet_length if sheet_length is None else to_ticks(sheet_length, self.units)
+        sheet_width = self.sheet_width if sheet_width is None else to_ticks(sheet_width, self.units)
+        for piece in self.cut_list():
+            if piece["length"] > sheet_length or piece["width"] > sheet_width:
+                print(f"Warning: Piece {self.format_size(piece)} is larger than the sheet size!")
+
+        signature = cut_list_signature(self.cut_list(), sheet_length, sheet_width)
+        if self.store is not None:
+            cached = self.store.cached_result(self.project_name, signature)
+            if cached is not None:
+                total_sheets, self.sheet_layouts, self.waste_tracking = cached
+                self.waste_stats = WasteStats()
+                for layout in self.sheet_layouts:
+                    self.waste_stats.add_sheet(layout)
+                if verbose:
+                    # Rebuild the per-piece breakdown from the cached layouts
+                    sheet_counts = Counter((layout["length"], layout["width"], layout["material"], layout["grain"]) for layout in self.sheet_layouts)
+                    for piece in self.cut_list():
+                        if piece["length"] <= sheet_length and piece["width"] <= sheet_width:
+                            sheets_needed = sheet_counts[(piece["length"], piece["width"], piece["material"], piece["grain"])]
+                            print(f"\n{sheets_needed} sheets needed for {piece['quantity']} pieces of size {self.format_size(piece)} {piece['material']}.")
+                    print(f"\nTotal sheets of plywood needed: {total_sheets} (cached result)")
+                return total_sheets
+
         total_sheets = 0
         self.waste_tracking = []  # Reset waste tracking
+        self.sheet_layouts = []
+        self.waste_stats = WasteStats()
 
-        for piece in self.plywood_pieces:
-            if piece["length"] > sheet_length or piece["width"] > sheet_width:
-                print(f"Warning: Piece {piece['length']}\" x {piece['width']}\" is larger than the sheet size!")
-                continue
+        # Oversize pieces were warned about above; materials may go to worker processes
+        pending = [piece for piece in self.cut_list() if piece["length"] <= sheet_length and piece["width"] <= sheet_width]
+        jobs = [(piece["length"], piece["width"], piece["material"], piece["quantity"]) for piece in pending]
+        nested = nest_pieces(jobs, sheet_length, sheet_width, workers)
 
-            sheets_needed = 0
-            remaining_quantity = piece["quantity"]
-            
-            # Total usable area of a standard sheet
+        for piece, sheets in zip(pending, nested):
             sheet_total_area = sheet_length * sheet_width
-            piece_area = piece["length"] * piece["width"]
-
-            while remaining_quantity > 0:
-                # Calculate how many pieces can fit on a sheet
-                pieces_per_sheet_x = sheet_length // piece["length"]
-                pieces_per_sheet_y = sheet_width // piece["width"]
-                pieces_per_sheet = pieces_per_sheet_x * pieces_per_sheet_y
-
-                if pieces_per_sheet == 0:
-                    # If piece is too large, count as full sheet waste
-                    sheets_needed += 1
-                    remaining_quantity -= 1
-                    waste_percentage = 100.0
-                else:
-                    # Determine pieces that can fit on this sheet
-                    pieces_on_this_sheet = min(remaining_quantity, pieces_per_sheet)
-                    
-                    # Calculate area used and wasted
-                    used_area = pieces_on_this_sheet * piece_area
-                    waste_area = sheet_total_area - used_area
-                    waste_percentage = (waste_area / sheet_total_area) * 100
-
-                    sheets_needed += 1
-                    remaining_quantity -= pieces_on_this_sheet
-
-                # Track waste for this sheet
+            for sheet_number, (pieces_on_this_sheet, waste_area) in enumerate(sheets, start=1):
+                # Track waste for this sheet; the size is formatted when shown, in the current units
                 self.waste_tracking.append({
-                    "sheet_number": sheets_needed,
-                    "piece_size": f"{piece['length']}x{piece['width']}",
-                    "waste_percentage": waste_percentage
+                    "sheet_number": sheet_number,
+                    "length": piece["length"],
+                    "width": piece["width"],
+                    "waste_percentage": (waste_area / sheet_total_area) * 100
+                })
+                # Pieces are laid out in columns down the sheet width
+                self.sheet_layouts.append({
+                    "sheet_number": len(self.sheet_layouts) + 1,
+                    "sheet_length": sheet_length,
+                    "sheet_width": sheet_width,
+                    "length": piece["length"],
+                    "width": piece["width"],
+                    "material": piece["material"],
+                    "grain": piece["grain"],
+                    "count": pieces_on_this_sheet,
+                    "rows": max(sheet_width // piece["width"], 1),
+                    "waste_area": waste_area
                 })
+                self.waste_stats.add_sheet(self.sheet_layouts[-1])
 
+            sheets_needed = len(sheets)
             total_sheets += sheets_needed
-            print(f"\n{sheets_needed} sheets needed for {piece['quantity']} pieces of size {piece['length']}\" x {piece['width']}\".")
+            if verbose:
+                print(f"\n{sheets_needed} sheets needed for {piece['quantity']} pieces of size {self.format_size(piece)} {piece['material']}.")
         
-        print(f"\nTotal sheets of plywood needed: {total_sheets}")
+        if verbose:
+            print(f"\nTotal sheets of plywood needed: {total_sheets}")
+        if self.store is not None:
+            self.store.save_result(self.project_name, signature, total_sheets, self.sheet_layouts, self.waste_tracking)
         return total_sheets
 
+    def layouts_match_cut_list(self):
+        """True if the last sheet calculation still covers exactly the current cut list."""
+        if not self.sheet_layouts:
+            return False
+        nested = Counter()
+        for layout in self.sheet_layouts:
+            nested[(layout["length"], layout["width"], layout["material"], layout["grain"])] += layout["count"]
+        sheet_length = self.sheet_layouts[0]["sheet_length"]
+        sheet_width = self.sheet_layouts[0]["sheet_width"]
+        wanted = Counter({
+            (piece["length"], piece["width"], piece["material"], piece["grain"]): piece["quantity"]
+            for piece in self.cut_list()
+            if piece["length"] <= sheet_length and piece["width"] <= sheet_width
+        })
+        return nested == wanted
+
+    def benchmark_parallel_nesting(self, core_counts=None, repeats=3):
+        """
+        Time nesting the current cut list with different numbers of worker
+        processes and print the speedup over a single process.
+        """
+        jobs = [(piece["length"], piece["width"], piece["material"], piece["quantity"])
+                for piece in self.cut_list()
+                if piece["length"] <= self.sheet_length and piece["width"] <= self.sheet_width]
+        if core_counts is None:
+            cores = os.cpu_count() or 1
+            core_counts = sorted({1, cores} | {2 ** power for power in range(1, cores.bit_length()) if 2 ** power <= cores})
+        if not jobs:
+            print("No pieces to nest. Add pieces before running the benchmark.")
+            return
+        materials = len({job[2] for job in jobs})
+        print(f"\nNesting {len(jobs)} pieces in {materials} materials, best of {repeats}:")
+        baseline = None
+        for workers in core_counts:
+            best = None
+            for _ in range(repeats):
+                nest_piece.cache_clear()  # time real nesting, not cache hits
+                started = time.perf_counter()
+                nest_pieces(jobs, self.sheet_length, self.sheet_width, workers)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            baseline = baseline or best
+            print(f"{workers:>3} workers: {best:.3f} s  ({baseline / best:.2f}x)")
+
     def calculate_waste(self):
-        """Calculate and display waste percentages"""
-        if not self.waste_tracking:
+        """
+        Display waste from the last sheet calculation: the area-weighted total,
+        per-sheet quantiles, the offcut size distribution and the waste
+        attributed to each piece size.
+        """
+        stats = self.waste_stats
+        if not stats.sheets:
             print("No waste data available. Run sheet calculation first.")
             return 0
-
-        # Calculate average waste percentage
-        total_waste_percentage = sum(waste['waste_percentage'] for waste in self.waste_tracking)
-        average_waste_percentage = total_waste_percentage / len(self.waste_tracking)
+        units = self.units
 
         print("\nWaste Tracking Report:")
-        for waste in self.waste_tracking:
-            print(f"Sheet for {waste['piece_size']}: {waste['waste_percentage']:.2f}% waste")
-        
-        print(f"\nOverall Average Waste: {average_waste_percentage:.2f}%")
-        return average_waste_percentage
+        for (length, width, material, grain), part in stats.worst_pieces():
+            size = f"{format_dimension(length, units)} x {format_dimension(width, units)} {material}"
+            print(f"{size}: {part['pieces']} pieces on {part['sheets']} sheets, "
+                  f"{area_from_ticks(part['waste_area'], units):.2f} sq {units} waste ({stats.piece_waste_percentage(part):.2f}%)")
+
+        print("\nOffcuts:")
+        for label, usable, unusable in stats.offcut_histogram(units):
+            print(f"{label}: {usable} usable, {unusable} unusable")
+
+        print(f"\nSheet waste median {stats.quantile(0.5):.1f}%, 90th percentile {stats.quantile(0.9):.1f}%")
+        print(f"Overall Waste: {stats.waste_percentage():.2f}% "
+              f"({area_from_ticks(stats.waste_area, units):.2f} of {area_from_ticks(stats.sheet_area, units):.2f} sq {units})")
+        return stats.waste_percentage()
+
+    def export_waste_stats(self, file_name=None):
+        """Write the per-piece waste attribution and offcut histogram to CSV."""
+        if file_name is None:
+            file_name = input("Enter file name to export waste statistics to: ")
+        if not self.layouts_match_cut_list():
+            self.calculate_plywood_sheets()
+        stats = self.waste_stats
+        units = self.units
+        with open(f"{file_name}_waste.csv", mode="w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow([f"Length ({units})", f"Width ({units})", "Material", "Grain", "Pieces", "Sheets",
+                             f"Waste Area (sq {units})", "Waste Percentage"])
+            for (length, width, material, grain), part in stats.worst_pieces():
+                writer.writerow([from_ticks(length, units), from_ticks(width, units), material, "y" if grain else "n",
+                                 part["pieces"], part["sheets"], area_from_ticks(part["waste_area"], units),
+                                 stats.piece_waste_percentage(part)])
+        with open(f"{file_name}_offcuts.csv", mode="w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow([f"Offcut Area (sq {units})", "Usable", "Unusable"])
+            writer.writerows(stats.offcut_histogram(units))
+        print(f"Waste statistics exported to {file_name}_waste.csv and {file_name}_offcuts.csv.")
 
     def generate_pdf_report(self, sheet_price=0):
         """
@@ -244,21 +926,24 @@ class WoodProject:
         story.append(materials_title)
         
         # Prepare table data
+        units = self.units
         table_data = [
-            ['Length (in)', 'Width (in)', 'Quantity', 'Piece Area (sq in)', 'Total Area (sq in)']
+            [f'Length ({units})', f'Width ({units})', 'Quantity', 'Material', 'Parts', f'Piece Area (sq {units})', f'Total Area (sq {units})']
         ]
         
         total_pieces = 0
         total_area = 0
         
-        for piece in self.plywood_pieces:
-            piece_area = piece['length'] * piece['width']
+        for piece in self.cut_list():
+            piece_area = area_from_ticks(piece['length'] * piece['width'], units)
             total_area_for_piece = piece_area * piece['quantity']
             
             table_data.append([
-                f"{piece['length']:.2f}",
-                f"{piece['width']:.2f}",
+                f"{from_ticks(piece['length'], units):.2f}",
+                f"{from_ticks(piece['width'], units):.2f}",
                 str(piece['quantity']),
+                piece['material'],
+                ", ".join(f"{label} x{count}" for label, count in piece['labels'].items()),
                 f"{piece_area:.2f}",
                 f"{total_area_for_piece:.2f}"
             ])
@@ -288,7 +973,7 @@ class WoodProject:
         plywood_cost = total_sheets * sheet_price
 
         # Additional Materials Cost
-        additional_materials_cost = sum(material['price'] for material in self.additional_materials)
+        additional_materials_cost = sum(material['price'] for material in self.all_materials())
         
         # Total Cost
         total_cost = plywood_cost + additional_materials_cost
@@ -301,7 +986,7 @@ class WoodProject:
         
         cost_data = [
             ['Total Pieces', str(total_pieces)],
-            ['Total Area (sq in)', f"{total_area:.2f}"],
+            [f'Total Area (sq {units})', f"{total_area:.2f}"],
             ['Sheets Required', str(total_sheets)],
             ['Price per Sheet', f"${sheet_price:.2f}"],
             ['Plywood Cost', f"${plywood_cost:.2f}"],
@@ -322,14 +1007,15 @@ class WoodProject:
         story.append(cost_table)
         
         # List of Additional Materials
-        if self.additional_materials:
+        all_materials = self.all_materials()
+        if all_materials:
             materials_summary = Paragraph("Additional Materials", styles['Heading2'])
             story.append(Spacer(1, 12))
             story.append(materials_summary)
             
-            materials_data = [['Name', 'Price']]
-            for material in self.additional_materials:
-                materials_data.append([material['name'], f"${material['price']:.2f}"])
+            materials_data = [['Name', 'Quantity', 'Price']]
+            for material in all_materials:
+                materials_data.append([material['name'], str(material['quantity']), f"${material['price']:.2f}"])
             
             materials_table = Table(materials_data)
             materials_table.setStyle(TableStyle([
@@ -354,21 +1040,16 @@ class WoodProject:
             ['Sheet Number', 'Piece Size', 'Waste Percentage']
         ]
         
-        total_waste_percentage = 0
         for waste in self.waste_tracking:
             waste_data.append([
                 str(waste['sheet_number']),
-                waste['piece_size'],
+                f"{format_dimension(waste['length'], units)}x{format_dimension(waste['width'], units)}",
                 f"{waste['waste_percentage']:.2f}%"
             ])
-            total_waste_percentage += waste['waste_percentage']
-        
-        # Calculate average waste
-        average_waste = total_waste_percentage / len(self.waste_tracking) if self.waste_tracking else 0
         
-        # Add average waste to the table
+        # Add area-weighted waste to the table
         waste_data.append([
-            'Average', 'Total Waste', f"{average_waste:.2f}%"
+            'Overall', 'Total Waste', f"{self.waste_stats.waste_percentage():.2f}%"
         ])
         
         # Create waste table
@@ -387,8 +1068,592 @@ class WoodProject:
         print(f"PDF report generated: {file_path}")
         return file_path
 
-def main():
 
+class WasteStats:
+    """
+    Running waste totals, updated one sheet at a time as sheets are nested.
+    Totals are area weighted, so a partly used sheet counts for its real
+    waste. Sheet waste percentages go into 0.1% bins, which makes quantiles
+    a fixed-size scan whatever the number of sheets.
+    """
+
+    BINS = 1001
+
+    def __init__(self):
+        self.sheets = 0
+        self.sheet_area = 0
+        self.waste_area = 0
+        self.waste_bins = [0] * self.BINS
+        self.offcuts = [[0, 0] for _ in range(len(OFFCUT_BUCKETS) + 1)]  # [usable, unusable] per bucket
+        self.pieces = {}  # piece key -> pieces, sheets, sheet and waste area
+
+    def add_sheet(self, layout):
+        sheet_area = layout["sheet_length"] * layout["sheet_width"]
+        waste_area = layout["waste_area"]
+        self.sheets += 1
+        self.sheet_area += sheet_area
+        self.waste_area += waste_area
+        self.waste_bins[waste_area * (self.BINS - 1) // sheet_area] += 1
+
+        key = (layout["length"], layout["width"], layout["material"], layout["grain"])
+        part = self.pieces.get(key)
+        if part is None:
+            part = self.pieces[key] = {"pieces": 0, "sheets": 0, "sheet_area": 0, "waste_area": 0}
+        part["pieces"] += layout["count"]
+        part["sheets"] += 1
+        part["sheet_area"] += sheet_area
+        part["waste_area"] += waste_area
+
+        for offcut_length, offcut_width in grid_offcuts(layout["sheet_length"], layout["sheet_width"], layout["length"],
+                                                       layout["width"], layout["count"], layout["rows"]):
+            usable = min(offcut_length, offcut_width) >= USABLE_OFFCUT_WIDTH
+            self.offcuts[bisect.bisect_right(OFFCUT_BUCKETS, offcut_length * offcut_width)][0 if usable else 1] += 1
+
+    def waste_percentage(self):
+        return self.waste_area / self.sheet_area * 100 if self.sheet_area else 0
+
+    def piece_waste_percentage(self, part):
+        return part["waste_area"] / part["sheet_area"] * 100 if part["sheet_area"] else 0
+
+    def quantile(self, q):
+        """Sheet waste percentage below which a fraction q of sheets fall, to 0.1%."""
+        target = q * self.sheets
+        seen = 0
+        for index, count in enumerate(self.waste_bins):
+            seen += count
+            if count and seen >= target:
+                return index * 100 / (self.BINS - 1)
+        return 0
+
+    def worst_pieces(self):
+        """Piece sizes ordered by the waste attributed to them, largest first."""
+        return sorted(self.pieces.items(), key=lambda item: item[1]["waste_area"], reverse=True)
+
+    def offcut_histogram(self, unit="in"):
+        """(area range, usable, unusable) rows for the offcut size buckets."""
+        edges = [f"{round(area_from_ticks(edge, unit)):,}" for edge in OFFCUT_BUCKETS]
+        labels = [f"< {edges[0]}"] + [f"{low}-{high}" for low, high in zip(edges, edges[1:])] + [f">= {edges[-1]}"]
+        return [(label, usable, unusable) for label, (usable, unusable) in zip(labels, self.offcuts)]
+
+
+class ProjectStore:
+    """
+    SQLite project repository. WAL mode lets many readers list and load
+    projects while one writer saves; every save is a single transaction.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS projects (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            units TEXT NOT NULL,
+            sheet_length INTEGER NOT NULL,
+            sheet_width INTEGER NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS projects_updated ON projects (updated_at);
+        CREATE TABLE IF NOT EXISTS pieces (
+            project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+            length INTEGER NOT NULL,
+            width INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            material TEXT NOT NULL,
+            grain INTEGER NOT NULL,
+            label TEXT
+        );
+        CREATE INDEX IF NOT EXISTS pieces_project ON pieces (project_id);
+        CREATE INDEX IF NOT EXISTS pieces_size ON pieces (length, width, material);
+        CREATE TABLE IF NOT EXISTS materials (
+            project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            price REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS materials_project ON materials (project_id);
+        CREATE TABLE IF NOT EXISTS assemblies (
+            project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            definition TEXT NOT NULL,
+            instances INTEGER NOT NULL,
+            PRIMARY KEY (project_id, name)
+        );
+        CREATE TABLE IF NOT EXISTS results (
+            project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+            signature TEXT NOT NULL,
+            total_sheets INTEGER NOT NULL,
+            layouts TEXT NOT NULL,
+            waste TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (project_id, signature)
+        );
+    """
+
+    def __init__(self, path="projects.db"):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(self.SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def project_id(self, name):
+        row = self.connection.execute("SELECT id FROM projects WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def save_project(self, project):
+        """Replace the stored copy of a project with its current state."""
+        with self.connection:
+            self.connection.execute(
+                """INSERT INTO projects (name, units, sheet_length, sheet_width, updated_at) VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (name) DO UPDATE SET units = excluded.units, sheet_length = excluded.sheet_length,
+                   sheet_width = excluded.sheet_width, updated_at = excluded.updated_at""",
+                (project.project_name, project.units, project.sheet_length, project.sheet_width, time.time())
+            )
+            project_id = self.project_id(project.project_name)
+            for table in ("pieces", "materials", "assemblies", "results"):
+                self.connection.execute(f"DELETE FROM {table} WHERE project_id = ?", (project_id,))
+
+            piece_rows = []
+            for piece in project.plywood_pieces:
+                common = (project_id, piece["length"], piece["width"])
+                unlabeled = piece["quantity"] - sum(piece["labels"].values())
+                for label, quantity in piece["labels"].items():
+                    piece_rows.append(common + (quantity, piece["material"], piece["grain"], label))
+                if unlabeled > 0:
+                    piece_rows.append(common + (unlabeled, piece["material"], piece["grain"], None))
+            self.connection.executemany("INSERT INTO pieces VALUES (?, ?, ?, ?, ?, ?, ?)", piece_rows)
+            self.connection.executemany(
+                "INSERT INTO materials VALUES (?, ?, ?)",
+                [(project_id, material["name"], material["price"]) for material in project.additional_materials]
+            )
+            self.connection.executemany(
+                "INSERT INTO assemblies VALUES (?, ?, ?, ?)",
+                [(project_id, name, json.dumps(encode_assembly(definition)), project.assembly_instances.get(name, 0))
+                 for name, definition in project.assemblies.items()]
+            )
+        project.store = self
+
+    def load_project(self, name):
+        row = self.connection.execute(
+            "SELECT id, units, sheet_length, sheet_width FROM projects WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            return None
+        project_id, units, sheet_length, sheet_width = row
+        project = WoodProject(name, units)
+        project.sheet_length = sheet_length
+        project.sheet_width = sheet_width
+        pieces = self.connection.execute(
+            "SELECT length, width, quantity, material, grain, label FROM pieces WHERE project_id = ?", (project_id,)
+        )
+        for length, width, quantity, material, grain, label in pieces:
+            project.merge_piece(length, width, quantity, material, bool(grain), label)
+        materials = self.connection.execute("SELECT name, price FROM materials WHERE project_id = ?", (project_id,))
+        project.additional_materials = [{"name": name, "price": price} for name, price in materials]
+        assemblies = self.connection.execute(
+            "SELECT name, definition, instances FROM assemblies WHERE project_id = ?", (project_id,)
+        )
+        for assembly_name, definition, instances in assemblies:
+            project.assemblies[assembly_name] = decode_assembly(json.loads(definition))
+            if instances:
+                project.assembly_instances[assembly_name] = instances
+        project.store = self
+        return project
+
+    def list_projects(self, search=""):
+        """Saved projects whose name contains search, newest first, with their piece counts."""
+        return self.connection.execute(
+            """SELECT name, units, updated_at,
+                      (SELECT COALESCE(SUM(quantity), 0) FROM pieces WHERE pieces.project_id = projects.id)
+               FROM projects WHERE name LIKE ? ORDER BY updated_at DESC""",
+            (f"%{search}%",)
+        ).fetchall()
+
+    def projects_using_piece(self, length, width, material=None):
+        """Names of projects that cut a piece of this size (ticks), using the size index."""
+        query = "SELECT DISTINCT projects.name FROM pieces JOIN projects ON projects.id = pieces.project_id WHERE length = ? AND width = ?"
+        parameters = [length, width]
+        if material is not None:
+            query += " AND material = ?"
+            parameters.append(material)
+        return [row[0] for row in self.connection.execute(query, parameters)]
+
+    def cached_result(self, name, signature):
+        row = self.connection.execute(
+            """SELECT total_sheets, layouts, waste FROM results JOIN projects ON projects.id = results.project_id
+               WHERE projects.name = ? AND signature = ?""",
+            (name, signature)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]), json.loads(row[2])
+
+    def save_result(self, name, signature, total_sheets, layouts, waste):
+        project_id = self.project_id(name)
+        if project_id is None:
+            return
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                (project_id, signature, total_sheets, json.dumps(layouts), json.dumps(waste), time.time())
+            )
+
+
+class CutListWatcher:
+    """
+    Keeps a project's loose pieces in step with a cut-list CSV. Each poll
+    parses only the rows appended, changed or removed since the last read
+    and adds or subtracts their quantities in the piece store.
+    """
+
+    def __init__(self, project, file_name):
+        self.project = project
+        self.file_name = file_name
+        self.stamp = None
+        self.text = ""
+        self.header = None
+        self.columns = None
+        self.lines = Counter()
+        self.parsed = {}  # row text -> merge_piece arguments, None if invalid
+
+    def poll(self):
+        """Apply any change to the file; returns (rows added, rows removed) or None."""
+        try:
+            stat = os.stat(self.file_name)
+        except FileNotFoundError:
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self.stamp:
+            return None
+        self.stamp = stamp
+        with open(self.file_name, mode="r", newline="") as file:
+            text = file.read()
+
+        header, _, body = text.partition("\n")
+        if header.rstrip("\r") != self.header:
+            # New or changed header: start over from the whole file
+            self.header = header.rstrip("\r")
+            fieldnames = next(csv.reader([self.header]), [])
+            try:
+                self.columns = (fieldnames,) + dimension_columns(fieldnames)
+            except StopIteration:
+                print(f"Error: {self.file_name} has no Length/Width columns.")
+                self.columns = None
+            self.project.clear_pieces()
+            self.text = ""
+            self.lines = Counter()
+            self.parsed = {}
+        if self.columns is None:
+            return None
+
+        if self.text.endswith("\n") and text.startswith(self.text):
+            # Rows were only appended: parse just the new tail
+            added = Counter(line for line in text[len(self.text):].splitlines() if line.strip())
+            removed = Counter()
+            self.lines += added
+        else:
+            lines = Counter(line for line in body.splitlines() if line.strip())
+            added = lines - self.lines
+            removed = self.lines - lines
+            self.lines = lines
+        self.text = text
+
+        for sign, rows in ((1, added), (-1, removed)):
+            for line, count in rows.items():
+                piece = self.parse(line)
+                if piece is not None:
+                    length, width, quantity, material, grain, label = piece
+                    self.project.merge_piece(length, width, sign * count * quantity, material, grain, label)
+        return sum(added.values()), sum(removed.values())
+
+    def parse(self, line):
+        if line not in self.parsed:
+            fieldnames, length_column, width_column, unit = self.columns
+            row = next(csv.DictReader([line], fieldnames=fieldnames))
+            try:
+                self.parsed[line] = (
+                    to_ticks(row[length_column], unit),
+                    to_ticks(row[width_column], unit),
+                    int(row["Quantity"]),
+                    row.get("Material") or DEFAULT_MATERIAL,
+                    parse_grain(row.get("Grain") or ""),
+                    row.get("Label") or None
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Skipping row {line!r}: {e}")
+                self.parsed[line] = None
+        return self.parsed[line]
+
+
+def encode_assembly(definition):
+    return {
+        "pieces": [list(key) + [quantity] for key, quantity in definition["pieces"].items()],
+        "materials": [list(key) + [quantity] for key, quantity in definition["materials"].items()],
+        "parts": definition["parts"],
+    }
+
+
+def decode_assembly(data):
+    return {
+        "pieces": {tuple(row[:5]): row[5] for row in data["pieces"]},
+        "materials": {tuple(row[:2]): row[2] for row in data["materials"]},
+        "parts": data["parts"],
+    }
+
+
+def cut_list_signature(pieces, sheet_length, sheet_width):
+    """Stable hash of a cut list and sheet size, used to key cached results."""
+    items = sorted((p["length"], p["width"], p["material"], p["grain"], p["quantity"]) for p in pieces)
+    return hashlib.sha1(repr((sheet_length, sheet_width, items)).encode()).hexdigest()
+
+
+def dimension_columns(fieldnames):
+    """
+    Find the length and width columns of a cut list and the unit named in
+    their header, e.g. 'Length (mm)'. Headers without a unit are read as inches.
+    """
+    length_column = next(name for name in fieldnames if name.lower().startswith("length"))
+    width_column = next(name for name in fieldnames if name.lower().startswith("width"))
+    match = re.search(r"\((.+?)\)", length_column)
+    unit = match.group(1).strip().lower() if match else "in"
+    return length_column, width_column, UNIT_ALIASES.get(unit, unit)
+
+
+def read_arrow_table(file_name):
+    """Open a Parquet or Arrow IPC file memory-mapped, so columns are not copied."""
+    if not os.path.exists(file_name):
+        raise FileNotFoundError(file_name)
+    if file_name.endswith(".parquet"):
+        return pq.read_table(file_name, memory_map=True)
+    return pa.ipc.open_file(pa.memory_map(file_name)).read_all()
+
+
+def ticks_column(column, unit):
+    """Convert a numeric or text dimension column to int64 ticks."""
+    if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+        # Parse each distinct text value once, e.g. '23 7/8'
+        encoded = pc.dictionary_encode(column.combine_chunks())
+        dictionary = pa.array([to_ticks(value, unit) for value in encoded.dictionary.to_pylist()], pa.int64())
+        return dictionary.take(encoded.indices)
+    scaled = pc.multiply(pc.cast(column, pa.float64()), float(UNIT_TICKS[unit]))
+    ticks = pc.cast(pc.round(scaled), pa.int64())
+    if pc.any(pc.less_equal(ticks, 0)).as_py():
+        raise ValueError("Dimensions must be greater than zero")
+    return ticks
+
+
+def group_cut_list(table):
+    """
+    Normalize a cut-list table to length/width ticks, material, grain and label
+    columns and sum the quantity of identical rows.
+    """
+    length_column, width_column, unit = dimension_columns(table.column_names)
+    for name in (length_column, width_column, "Quantity"):
+        if table[name].null_count:
+            raise ValueError(f"Missing values in column {name}")
+    rows = table.num_rows
+    columns = {
+        "length": ticks_column(table[length_column], unit),
+        "width": ticks_column(table[width_column], unit),
+        "quantity": pc.cast(table["Quantity"], pa.int64()),
+    }
+    if "Material" in table.column_names:
+        columns["material"] = pc.fill_null(pc.cast(table["Material"], pa.string()), DEFAULT_MATERIAL)
+    else:
+        columns["material"] = pa.repeat(DEFAULT_MATERIAL, rows)
+    if "Grain" not in table.column_names:
+        columns["grain"] = pa.repeat(False, rows)
+    elif pa.types.is_boolean(table["Grain"].type):
+        columns["grain"] = pc.fill_null(table["Grain"], False)
+    else:
+        grain = pc.utf8_lower(pc.utf8_trim_whitespace(pc.cast(table["Grain"], pa.string())))
+        columns["grain"] = pc.is_in(grain, value_set=pa.array(["y", "yes", "true", "1"]))
+    if "Label" in table.column_names:
+        columns["label"] = pc.fill_null(pc.cast(table["Label"], pa.string()), "")
+    else:
+        columns["label"] = pa.repeat("", rows)
+    keys = ["length", "width", "material", "grain", "label"]
+    grouped = pa.table(columns).group_by(keys).aggregate([("quantity", "sum")])
+    # Select by name: the column order of aggregate() output differs between pyarrow releases
+    return grouped.select(keys + ["quantity_sum"]).rename_columns(keys + ["quantity"])
+
+
+def setup_changes(a, b):
+    """Number of saw setting changes between two (rip width, crosscut length) setups."""
+    return (a[0] != b[0]) + (a[1] != b[1])
+
+
+def tour_order(nodes, distance):
+    """
+    Visit order for nodes starting at the first one: nearest neighbour, then
+    2-opt reversals until no segment flip shortens the open path.
+    """
+    count = len(nodes)
+    if count < 3:
+        return list(range(count))
+    order = [0]
+    remaining = set(range(1, count))
+    while remaining:
+        last = nodes[order[-1]]
+        closest = min(remaining, key=lambda index: distance(last, nodes[index]))
+        order.append(closest)
+        remaining.remove(closest)
+
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, count - 1):
+            for j in range(i + 1, count):
+                a, b, c = nodes[order[i - 1]], nodes[order[i]], nodes[order[j]]
+                before = distance(a, b)
+                after = distance(a, c)
+                if j + 1 < count:
+                    d = nodes[order[j + 1]]
+                    before += distance(c, d)
+                    after += distance(b, d)
+                if after < before:
+                    order[i:j + 1] = reversed(order[i:j + 1])
+                    improved = True
+    return order
+
+
+@lru_cache(maxsize=None)
+def guillotine_cuts(sheet_length, sheet_width, length, width, count, rows):
+    """
+    Rip-then-crosscut sequence for a grid layout as (cut, strip, position)
+    tuples. Strips are ripped off the sheet width; each strip is crosscut
+    into pieces. Cuts that would land on the sheet edge are skipped.
+    """
+    columns, extra = divmod(count, rows)
+    strips = min(count, rows)
+    cuts = []
+    for strip in range(1, strips + 1):
+        if strip * width < sheet_width:
+            cuts.append(("rip", strip, strip * width))
+    for strip in range(1, strips + 1):
+        pieces = columns + (1 if strip <= extra else 0)
+        for piece in range(1, pieces + 1):
+            if piece * length < sheet_length:
+                cuts.append(("crosscut", strip, piece * length))
+    return tuple(cuts)
+
+
+def nest_pieces(jobs, sheet_length, sheet_width, workers=1):
+    """
+    Nest (length, width, material, quantity) jobs and return each one's sheets
+    in order. Each material is independent, so with workers > 1 (None for
+    every core) they are nested in worker processes, which read the pieces
+    from one shared-memory int64 array instead of pickled lists. Serial is
+    the default: each piece is O(1) work, and so far the benchmark has not
+    shown process startup paying for itself.
+    """
+    if not jobs:
+        return []
+    partitions = {}
+    for index, (_, _, material, _) in enumerate(jobs):
+        partitions.setdefault(material, []).append(index)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        return [nest_piece(sheet_length, sheet_width, length, width, quantity) if quantity > 0 else ()
+                for length, width, _, quantity in jobs]
+
+    # Pieces grouped by material; big materials are split so workers stay busy
+    order = [index for indexes in partitions.values() for index in indexes]
+    chunk = max(1, -(-len(jobs) // (workers * 4)))
+    ranges = []
+    start = 0
+    for indexes in partitions.values():
+        for offset in range(0, len(indexes), chunk):
+            ranges.append((start + offset, start + min(offset + chunk, len(indexes))))
+        start += len(indexes)
+
+    packed = array("q")
+    for index in order:
+        length, width, _, quantity = jobs[index]
+        packed.extend((length, width, quantity))
+    memory = shared_memory.SharedMemory(create=True, size=len(packed) * packed.itemsize)
+    try:
+        memory.buf[:len(packed) * packed.itemsize] = packed.tobytes()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(
+                nest_partition,
+                [memory.name] * len(ranges),
+                [start for start, _ in ranges],
+                [end for _, end in ranges],
+                [sheet_length] * len(ranges),
+                [sheet_width] * len(ranges)
+            )
+            sheets = [()] * len(jobs)
+            position = 0
+            for runs_per_piece in results:
+                for runs in runs_per_piece:
+                    sheets[order[position]] = tuple(sheet for sheet, repeat in runs for _ in range(repeat))
+                    position += 1
+    finally:
+        memory.close()
+        memory.unlink()
+    return sheets
+
+
+def nest_partition(memory_name, start, end, sheet_length, sheet_width):
+    """
+    Worker for nest_pieces: nest pieces start..end of the shared piece array.
+    Sheets come back run-length encoded, since most are identical full sheets.
+    """
+    memory = shared_memory.SharedMemory(name=memory_name)
+    values = memory.buf.cast("q")
+    try:
+        results = []
+        for offset in range(start * 3, end * 3, 3):
+            length, width, quantity = values[offset], values[offset + 1], values[offset + 2]
+            sheets = nest_piece(sheet_length, sheet_width, length, width, quantity) if quantity > 0 else ()
+            results.append([(sheet, len(list(group))) for sheet, group in groupby(sheets)])
+        return results
+    finally:
+        values.release()
+        memory.close()
+
+
+@lru_cache(maxsize=4096)
+def grid_offcuts(sheet_length, sheet_width, length, width, count, rows):
+    """
+    Leftover rectangles of a grid layout as (length, width) pairs: the end of
+    the sheet past the last column, the edge strip below the full columns and
+    the space below a partly filled last column. Cached per pattern, since
+    most sheets of a job repeat the same few patterns.
+    """
+    if count == 0:
+        return ((sheet_length, sheet_width),)
+    full_columns, extra = divmod(count, rows)
+    used_columns = full_columns + (1 if extra else 0)
+    offcuts = [
+        (sheet_length - used_columns * length, sheet_width),
+        (full_columns * length, sheet_width - rows * width),
+    ]
+    if extra:
+        offcuts.append((length, sheet_width - extra * width))
+    return tuple((offcut_length, offcut_width) for offcut_length, offcut_width in offcuts if offcut_length > 0 and offcut_width > 0)
+
+
+@lru_cache(maxsize=None)
+def toolpath(length, width, count, rows):
+    """
+    Piece origins of a grid layout in CNC cutting order, starting from the
+    machine origin. Columns are cut in a serpentine, up one column and down
+    the next, which is already the shortest route through a regular grid.
+    """
+    origins = []
+    for column in range(-(-count // rows)):
+        pieces = min(rows, count - column * rows)
+        row_order = range(pieces) if column % 2 == 0 else range(pieces - 1, -1, -1)
+        origins.extend((column * length, row * width) for row in row_order)
+    return tuple(origins)
+
+
+def main():
+    store = None  # opened the first time a database option is used
 
     while True:
         print("\nWood Calculator Menu:")
@@ -402,9 +1667,21 @@ def main():
         print("8. Price calculator")
         print("9. Generate PDF Report")
         print("10. Calculate Waste Percentage")
-        print("11. Exit")
+        print("11. Set units")
+        print("12. Load from Parquet/Arrow")
+        print("13. Export results to Parquet")
+        print("14. Export cut plan")
+        print("15. Define assembly")
+        print("16. Add assembly to project")
+        print("17. Save to project database")
+        print("18. Open from project database")
+        print("19. List saved projects")
+        print("20. Watch cut-list CSV")
+        print("21. Export waste statistics")
+        print("22. Benchmark parallel nesting")
+        print("23. Exit")
 
-        choice = input("Enter your choice (1-11): ")
+        choice = input("Enter your choice (1-23): ")
 
         if choice == "1":
             project_name = input("Enter project name: ")
@@ -438,6 +1715,57 @@ def main():
             project.calculate_waste()
 
         elif choice == "11":
+            project.set_units()
+
+        elif choice == "12":
+            project.read_from_columnar()
+
+        elif choice == "13":
+            project.export_results()
+
+        elif choice == "14":
+            project.export_cut_plan()
+
+        elif choice == "15":
+            project.new_assembly()
+
+        elif choice == "16":
+            try:
+                name = input(f"Enter assembly name ({', '.join(project.assemblies)}): ").strip()
+                project.add_assembly(name, int(input("Enter quantity: ")))
+            except ValueError as e:
+                print(f"Invalid input: {e}")
+
+        elif choice == "17":
+            store = store or ProjectStore()
+            store.save_project(project)
+            print(f"Project {project.project_name} saved to {store.path}.")
+
+        elif choice == "18":
+            store = store or ProjectStore()
+            name = input("Enter project name to open: ")
+            loaded = store.load_project(name)
+            if loaded is None:
+                print(f"Error: no saved project named {name}.")
+            else:
+                project = loaded
+                print(f"Project {name} loaded from {store.path}.")
+
+        elif choice == "19":
+            store = store or ProjectStore()
+            for name, units, updated_at, pieces in store.list_projects(input("Search (blank for all): ")):
+                print(f"{name}: {pieces} pieces ({units}), saved {time.strftime('%Y-%m-%d %H:%M', time.localtime(updated_at))}")
+
+        elif choice == "20":
+            project.watch_csv()
+
+        elif choice == "21":
+            project.export_waste_stats()
+
+        elif choice == "22":
+            project.benchmark_parallel_nesting()
+
+        elif choice == "23":
             print("Exiting program. Goodbye!")
             break
 
@@ -0,0 +1,47 @@
+import importlib.util
+import os
+
+import pytest
+
+# 2nd.py is not an importable module name, so load it from its path
+spec = importlib.util.spec_from_file_location("woodproject", os.path.join(os.path.dirname(__file__), os.pardir, "2nd.py"))
+woodproject = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(woodproject)
+to_ticks = woodproject.to_ticks
+INCH = woodproject.TICKS_PER_INCH
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("3/4", 3 * INCH // 4),
+    ("23 7/8", 23 * INCH + 7 * INCH // 8),
+    ("23-7/8", 23 * INCH + 7 * INCH // 8),
+    ("1/64", INCH // 64),
+    ("48", 48 * INCH),
+    (48, 48 * INCH),
+    (23.875, 23 * INCH + 7 * INCH // 8),
+])
+def test_inches(value, expected):
+    assert to_ticks(value) == expected
+
+
+@pytest.mark.parametrize("value, unit, expected", [
+    ('3/4"', "mm", 3 * INCH // 4),
+    ("2 ft", "in", 24 * INCH),
+    ("600mm", "in", 600 * 320),
+    ("60.5 cm", "in", 605 * 320),
+    ("0.1", "mm", 32),
+    ("600", "mm", 600 * 320),
+])
+def test_units(value, unit, expected):
+    assert to_ticks(value, unit) == expected
+
+
+@pytest.mark.parametrize("value", ["0", 0, "0/4", "-5", -5, "-3/4", "1/0", "23 1/0", "5-", "23 7", "abc", "", "2 3 4"])
+def test_invalid(value):
+    with pytest.raises(ValueError):
+        to_ticks(value)
+
+
+def test_unknown_unit():
+    with pytest.raises(ValueError):
+        to_ticks("5 furlongs")